@@ -1,85 +1,223 @@
 # Calculate intensity profile observed after diffraction of a coherent plane wave
 # by a circular object. Create look-up table for this.
 
+from concurrent.futures import ThreadPoolExecutor
+import os
 import numpy as np
-from scipy.special import jn
+from scipy.special import jv
 import scipy.interpolate
 
+HALF_PI = np.pi / 2
+
+LUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'occultation_intensity_lut.npy')
+# Grid the look-up table is tabulated on. Only the intensities are saved to LUT_PATH.
+LUT_R_POINTS = np.linspace(0, 20, 400)
+LUT_RHO_POINTS = np.linspace(0.01, 20, 400)
+
+def bessel_jn_sequence(max_order, z):
+    '''Bessel functions of the first kind J_0(z), ..., J_max_order(z).
+
+    Only J_0 and J_1 are evaluated with scipy. Higher orders follow from the
+    upward recurrence J_{k+1} = (2k/z) J_k - J_{k-1} where it is stable (k < z),
+    and from the ratios J_k / J_{k-1} given by Miller's downward recurrence
+    where it is not. For one or two arguments the Python-level recurrence costs
+    more than evaluating every order directly, so scipy's jv is broadcast over
+    the orders instead.
+
+    Parameters:
+    ----------
+    max_order : int
+        Highest order to compute.
+    z : float or array_like
+        Non-negative argument of the Bessel functions.
+
+    Returns:
+    -------
+    bessel : ndarray
+        Array of shape (max_order + 1,) + z.shape with bessel[k] = J_k(z).
+    '''
+    z = np.asarray(z, dtype=float)
+    if z.size <= 2:
+        orders = np.arange(max_order + 1, dtype=float).reshape((-1,) + (1,) * z.ndim)
+        return jv(orders, z)
+    bessel = np.empty((max_order + 1,) + z.shape)
+    bessel[0] = jv(0, z)
+    if max_order == 0:
+        return bessel
+    bessel[1] = jv(1, z)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        two_over_z = 2 / z
+        # Downward pass, started well above max_order, storing J_k / J_{k-1} in bessel[k]
+        ratio = np.zeros(z.shape)
+        for k in range(max_order + int(np.sqrt(160 * max_order)), 1, -1):
+            ratio = 1 / (k * two_over_z - ratio)
+            if k <= max_order:
+                bessel[k] = ratio
+        # Upward pass, replacing the ratios with J_k where upward recurrence is unstable
+        for k in range(2, max_order + 1):
+            upward = (k - 1) * two_over_z * bessel[k - 1] - bessel[k - 2]
+            bessel[k] = np.where(k - 1 < z, upward, bessel[k - 1] * bessel[k])
+    return bessel
+
 # Per Eq. 11 in Rocques & Moncuquet 2000
-def lommel_u(n, x, y):
-    '''Lommel function U_n(x, y) for x <= y.
+def lommel_u_sequence(n, num_orders, x, y):
+    '''Lommel functions U_n(x, y), ..., U_{n+num_orders-1}(x, y) for x <= y, evaluated element-wise.
+
+    The series share the powers of x / y and one Bessel table, so they are summed
+    together in a single pass.
 
     Parameters:
     ----------
     n : int
-        Order of the Lommel function.
-    x : float
-        First argument of the Lommel function. Must be less than or equal to y.
-    y : float
-        Second argument of the Lommel function.
+        Order of the first Lommel function.
+    num_orders : int
+        Number of consecutive orders to compute.
+    x : float or array_like
+        First argument of the Lommel functions. Must be less than or equal to y.
+    y : float or array_like
+        Second argument of the Lommel functions.
+
+    Returns:
+    -------
+    u : list of ndarray
+        u[j] = U_{n+j}(x, y).
     '''
-    if x > y:
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    if np.any(x > y):
         raise ValueError("x must be less than or equal to y.")
-    sum_result = 0
-    for k in range(50):  # Summation to 50 terms should be accurate enough
-        term = ((-1)**k * (x / y)**(n + 2 * k) * jn(n + 2 * k, np.pi * x * y))
-        sum_result += term
-    return sum_result
+    z = np.pi * x * y
+    ratio = x / y
+    num_terms = 50  # Summation to 50 terms should be accurate enough
+    # Since |J_m| <= 1, the terms from k onwards sum to at most
+    # (x / y)**(n + 2k) / (1 - (x / y)**2). Stop once that is negligible everywhere.
+    max_ratio = ratio.max(initial=0)
+    if max_ratio == 0:
+        num_terms = 1
+    elif max_ratio < 1:
+        tail_terms = (np.log(1e-15 * (1 - max_ratio**2)) / np.log(max_ratio) - n) / 2
+        num_terms = int(np.clip(np.ceil(tail_terms), 1, num_terms))
+    bessel = bessel_jn_sequence(n + num_orders - 1 + 2 * (num_terms - 1), z)
+    # coefficients[k] = (-1)**k * (x / y)**(n + 2k), as a running product over k
+    coefficients = np.empty((num_terms,) + x.shape)
+    coefficients[0] = ratio**n
+    coefficients[1:] = -ratio * ratio
+    np.cumprod(coefficients, axis=0, out=coefficients)
+    # Sum all terms at once against J_{n+j+2k}. The U_{n+j} terms carry j extra powers of x / y.
+    u = []
+    ratio_pow = np.ones_like(x)
+    for j in range(num_orders):
+        u.append(ratio_pow * np.einsum('k...,k...->...', coefficients, bessel[n + j:n + j + 2 * num_terms:2]))
+        ratio_pow = ratio_pow * ratio
+    return u
+
+def lommel_u(n, x, y):
+    '''Lommel function U_n(x, y) for x <= y, evaluated element-wise.
+
+    See lommel_u_sequence for the parameters.
+    '''
+    return lommel_u_sequence(n, 1, x, y)[0]
 
 # Per Eqs. 9 and 10 in Rocques & Moncuquet 2000
 def occultation_intensity(r, rho):
     '''Intensity profile for a TNO occultation at distance r from the shadow center.
-    
+
     Parameters:
     ----------
-    r : float
+    r : float or array_like
         Distance from the center of the shadow in Fresnel units.
-    rho : float
+    rho : float or array_like
         Radius of the TNO in Fresnel units.'''
-    if r >= rho:
-        # Outside the shadow (Equation 9)
-        u1 = lommel_u(1, rho, r)
-        u2 = lommel_u(2, rho, r)
-        term1 = 1 + u1**2 + u2**2
-        term2 = -2 * u1 * np.sin(np.pi / 2 * (r**2 + rho**2))
-        term3 = 2 * u2 * np.cos(np.pi / 2 * (r**2 + rho**2))
-        return term1 + term2 + term3
-    else:
-        # Inside the shadow (Equation 10)
-        u0 = lommel_u(0, r, rho)
-        u1 = lommel_u(1, r, rho)
-        return u0**2 + u1**2
-    
+    r, rho = np.broadcast_arrays(np.asarray(r, dtype=float), np.asarray(rho, dtype=float))
+    # Outside the shadow the Lommel functions are U_n(rho, r), inside they are U_n(r, rho).
+    # Either way that is U_n(min, max), so both branches are evaluated everywhere from
+    # one set of Lommel series and selected with a mask.
+    u0, u1, u2 = lommel_u_sequence(0, 3, np.minimum(r, rho), np.maximum(r, rho))
+    phase = HALF_PI * (r * r + rho * rho)
+    # Outside the shadow (Equation 9)
+    outside = 1 + u1**2 + u2**2 - 2 * u1 * np.sin(phase) + 2 * u2 * np.cos(phase)
+    # Inside the shadow (Equation 10)
+    inside = u0**2 + u1**2
+    return np.where(r >= rho, outside, inside)[()]
+
+def build_lut(r_points, rho_points, block_rows=25, workers=None):
+    '''Tabulate occultation_intensity on the grid of r_points x rho_points.
+
+    Blocks of rows are evaluated in a thread pool; numpy and scipy release the
+    GIL inside their array loops, so the blocks run in parallel across cores.
+
+    Parameters:
+    ----------
+    r_points : array_like
+        Distances from the center of the shadow in Fresnel units.
+    rho_points : array_like
+        Radii of the TNO in Fresnel units.
+    block_rows : int
+        Number of r values evaluated together in each task.
+    workers : int, optional
+        Number of threads. Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+    -------
+    lut : ndarray
+        Array of shape (len(r_points), len(rho_points)) with
+        lut[i, j] = occultation_intensity(r_points[i], rho_points[j]).
+    '''
+    r_points = np.asarray(r_points, dtype=float)
+    rho_points = np.asarray(rho_points, dtype=float)
+    lut = np.empty((r_points.size, rho_points.size))
+
+    def fill_block(start):
+        rows = slice(start, start + block_rows)
+        lut[rows] = occultation_intensity(r_points[rows, None], rho_points[None, :])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fill_block, range(0, r_points.size, block_rows)))
+    return lut
+
+def load_lut(path=LUT_PATH):
+    '''Load the look-up table of intensities tabulated on LUT_R_POINTS x LUT_RHO_POINTS.
+
+    The table is stored in single precision and memory-mapped read-only, so it is paged
+    in from disk as it is read.'''
+    return np.load(path, mmap_mode='r')
+
+def lut_interpolator(lut):
+    '''Bicubic spline interpolator over a look-up table from build_lut on LUT_R_POINTS x LUT_RHO_POINTS.
+
+    The returned function is called as interpolator(r, rho) with broadcastable arrays
+    and returns nan outside the tabulated range rather than extrapolating.'''
+    spline = scipy.interpolate.RectBivariateSpline(LUT_R_POINTS, LUT_RHO_POINTS, lut, kx=3, ky=3)
+
+    def interpolator(r, rho):
+        r, rho = np.broadcast_arrays(np.asarray(r, dtype=float), np.asarray(rho, dtype=float))
+        intensity = spline.ev(r, rho)
+        outside = ((r < LUT_R_POINTS[0]) | (r > LUT_R_POINTS[-1])
+                   | (rho < LUT_RHO_POINTS[0]) | (rho > LUT_RHO_POINTS[-1]))
+        intensity[outside] = np.nan
+        return intensity[()]
+
+    return interpolator
+
 if __name__ == '__main__':
     import time
-    import os
     import matplotlib.pyplot as plt
     
     # Create lookup table for the intensity profile.
-    num_points = 400
-    r_points = np.linspace(0, 20, num_points)
-    rho_points = np.linspace(0.01, 20, num_points)
-    lut_array = np.zeros((num_points ** 2, 3))
-    for i, r in enumerate(r_points):
-        for j, rho in enumerate(rho_points):
-            lut_array[i * num_points + j] = [r, rho, occultation_intensity(r, rho)]
-
-    # Save LUT to csv file
-    directory = os.path.dirname(os.path.abspath(__file__))
-    np.savetxt(directory + '/occultation_intensity_lut.csv', lut_array, delimiter=',', header='r,rho,intensity', comments='')
+    lut = build_lut(LUT_R_POINTS, LUT_RHO_POINTS)
+
+    # Save LUT to numpy binary file. The intensities are computed in double precision but
+    # single precision is ample next to the interpolation error, and halves the file size.
+    np.save(LUT_PATH, lut.astype(np.float32))
 
     # Create interpolator
-    interpolator = scipy.interpolate.CloughTocher2DInterpolator(lut_array[:, :2], lut_array[:, 2])
+    interpolator = lut_interpolator(lut)
 
     # See whether it's faster to interpolate from lookup table or calculate directl
     grid_x, grid_y = np.mgrid[0:10:100j, 0.01:10:100j]
     t0 = time.time()
-    result1 = np.zeros((100, 100))
-    for i in range(100):
-        for j in range(100):
-            result1[i, j] = occultation_intensity(grid_x[i, j], grid_y[i, j])
+    result1 = occultation_intensity(grid_x, grid_y)
     t1 = time.time()
-    result2 = interpolator((grid_x, grid_y))
+    result2 = interpolator(grid_x, grid_y)
     t2 = time.time()
     print("Direct calculation took", t1 - t0, "seconds.")
     print("Interpolation took", t2 - t1, "seconds.")
@@ -90,7 +228,7 @@ if __name__ == '__main__':
     ax[0].set_xlabel("r")
     ax[0].set_ylabel("rho")
     ax[0].set_title("Direct calculation")
-    ax[1].imshow(result1, extent=(0.01, 10, 0, 10), aspect='auto')
+    ax[1].imshow(result2, extent=(0.01, 10, 0, 10), aspect='auto')
     ax[1].set_xlabel("r")
     ax[1].set_ylabel("rho")
     ax[1].set_title("Interpolation")
@@ -107,51 +107,95 @@ ax.plot([TNO_initial_position[0] + TNO_radius + 0.75, TNO_initial_position[0] +
 ax.plot([TNO_initial_position[0] + TNO_radius + 0.75, TNO_initial_position[0] + TNO_radius + 0.25], [TNO_initial_position[1] + TNO_radius, TNO_initial_position[1] + TNO_radius], color='black')
 ax.text(TNO_initial_position[0] + TNO_radius + 1, TNO_initial_position[1], r'2$R_{TNO}$', color='black', fontsize=12, ha='left', va='center')
 
+# Keep references to the artists that move with the sliders
+tno_label, D_label, Fs_label, r_label, star_radius_label, tno_radius_label = [ax.texts[i] for i in (1, 3, 4, 5, 6, 7)]
+D_line, D_tick = ax.lines[2], ax.lines[4]
+Fs_line, Fs_lower_tick, Fs_upper_tick = ax.lines[5:8]
+r_line, r_tick = ax.lines[8], ax.lines[10]
+star_radius_line = ax.lines[11]
+tno_radius_line, tno_radius_lower_tick, tno_radius_upper_tick = ax.lines[12:15]
+# Slider-independent quantities used by update()
+earth_edge = earth_position[0] + earth_radius
+star_radius_per_distance = star_radius / (star_position[0] - earth_position[0])
+
+# Artists drawn by blitting: everything that moves with the sliders, plus the static lines
+# and labels stacked above the shadows so they are still painted over them. They are left
+# out of full redraws and instead drawn in zorder over a cached background of the rest of
+# the figure on each slider event. The stable sort keeps the order they were added in.
+animated_artists = sorted([tno, outer_shadow, inner_shadow, *ax.lines, *ax.texts],
+                          key=lambda artist: artist.get_zorder())
+for artist in animated_artists:
+    artist.set_animated(True)
+# The slider axes, including their value labels and handles drawn outside the axes, are
+# blitted too, rather than redrawn through draw_idle
+x_slider.drawon = False
+y_slider.drawon = False
+ax_x.set_animated(True)
+ax_y.set_animated(True)
+background = None
+
+def draw_animated():
+    for artist in animated_artists:
+        ax.draw_artist(artist)
+    fig.draw_artist(ax_x)
+    fig.draw_artist(ax_y)
+
+# Cache the static background after every full draw (first show, resize, ...)
+def on_draw(event):
+    global background
+    # Saving a figure renders at the output resolution and already includes the animated
+    # artists of ax, but not the animated slider axes. Add those to the saved image and
+    # keep the cached background of the canvas.
+    if fig.canvas.is_saving():
+        ax_x.draw(event.renderer)
+        ax_y.draw(event.renderer)
+        return
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+    draw_animated()
+
+fig.canvas.mpl_connect('draw_event', on_draw)
+
 # The function to be called anytime a slider's value changes
 def update(val):
-    tno.set_center((x_slider.val, y_slider.val))
-    ax.texts[1].set_position((x_slider.val, 4.5))
+    x, y = x_slider.val, y_slider.val
+    tno.set_center((x, y))
+    tno_label.set_position((x, 4.5))
     # Adjust line from earth to TNO
-    ax.lines[2].set_xdata([earth_position[0] + earth_radius, x_slider.val])
-    ax.lines[4].set_xdata([x_slider.val, x_slider.val])
-    fresnel_scale = np.sqrt(x_slider.val - earth_position[0] - earth_radius) / 2
-    ax.texts[3].set_position(((x_slider.val + earth_position[0] + earth_radius) / 2, -2.5))
+    D_line.set_xdata([earth_edge, x])
+    D_tick.set_xdata([x, x])
+    fresnel_scale = np.sqrt(x - earth_edge) / 2
+    D_label.set_position(((x + earth_edge) / 2, -2.5))
     # Adjust line to shadow center
-    ax.lines[8].set_ydata([y_slider.val, earth_position[1]])
-    ax.lines[10].set_ydata([y_slider.val, y_slider.val])
-    ax.texts[5].set_position((earth_position[0] - earth_radius - 1.5, (earth_position[1] + y_slider.val) / 2))
+    r_line.set_ydata([y, earth_position[1]])
+    r_tick.set_ydata([y, y])
+    r_label.set_position((earth_position[0] - earth_radius - 1.5, (earth_position[1] + y) / 2))
     # Adjust fresnel scale line
-    ax.lines[5].set_xdata([x_slider.val, x_slider.val])
-    ax.lines[5].set_ydata([-fresnel_scale / 2 + y_slider.val, fresnel_scale / 2 + y_slider.val])
-    ax.lines[6].set_xdata([x_slider.val - 0.25, x_slider.val + 0.25])
-    ax.lines[6].set_ydata([-fresnel_scale / 2 + y_slider.val, -fresnel_scale / 2 + y_slider.val])
-    ax.lines[7].set_xdata([x_slider.val - 0.25, x_slider.val + 0.25])
-    ax.lines[7].set_ydata([fresnel_scale / 2 + y_slider.val, fresnel_scale / 2 + y_slider.val])
+    Fs_line.set_data([x, x], [-fresnel_scale / 2 + y, fresnel_scale / 2 + y])
+    Fs_lower_tick.set_data([x - 0.25, x + 0.25], [-fresnel_scale / 2 + y, -fresnel_scale / 2 + y])
+    Fs_upper_tick.set_data([x - 0.25, x + 0.25], [fresnel_scale / 2 + y, fresnel_scale / 2 + y])
     # Move the label
-    ax.texts[4].set_position((x_slider.val, y_slider.val + 0.5 + fresnel_scale / 2))
+    Fs_label.set_position((x, y + 0.5 + fresnel_scale / 2))
     # Move the shadow
-    ax.patches[3].set_width(x_slider.val - earth_position[0] - earth_radius)
-    ax.patches[3].set_height(fresnel_scale)
-    ax.patches[3].set_xy([earth_position[0] + earth_radius, -fresnel_scale / 2 + y_slider.val])
+    outer_shadow.set_bounds(earth_edge, -fresnel_scale / 2 + y, x - earth_edge, fresnel_scale)
     # Move the geometric shadow
-    ax.patches[4].set_width(x_slider.val - earth_position[0] - earth_radius)
-    ax.patches[4].set_xy([earth_position[0] + earth_radius, -TNO_radius + y_slider.val])
+    inner_shadow.set_bounds(earth_edge, -TNO_radius + y, x - earth_edge, TNO_radius * 2)
     # Adjust projected stellar radius
-    projected_star_radius = star_radius * (x_slider.val - earth_position[0]) / (star_position[0] - earth_position[0])
-    ax.lines[11].set_xdata([x_slider.val, x_slider.val])
-    ax.lines[11].set_ydata([-projected_star_radius, projected_star_radius])
-    ax.texts[6].set_position((x_slider.val, -projected_star_radius - 0.5))
+    projected_star_radius = star_radius_per_distance * (x - earth_position[0])
+    star_radius_line.set_data([x, x], [-projected_star_radius, projected_star_radius])
+    star_radius_label.set_position((x, -projected_star_radius - 0.5))
 
     # Move the TNO radius label and line
-    ax.lines[12].set_xdata([x_slider.val + TNO_radius + 0.5, x_slider.val + TNO_radius + 0.5])
-    ax.lines[12].set_ydata([y_slider.val - TNO_radius, y_slider.val + TNO_radius])
-    ax.lines[13].set_xdata([x_slider.val + TNO_radius + 0.75, x_slider.val + TNO_radius + 0.25])
-    ax.lines[13].set_ydata([y_slider.val - TNO_radius, y_slider.val - TNO_radius])
-    ax.lines[14].set_xdata([x_slider.val + TNO_radius + 0.75, x_slider.val + TNO_radius + 0.25])
-    ax.lines[14].set_ydata([y_slider.val + TNO_radius, y_slider.val + TNO_radius])
-    ax.texts[7].set_position((x_slider.val + TNO_radius + 1, y_slider.val))
-
-    fig.canvas.draw_idle()
+    tno_radius_line.set_data([x + TNO_radius + 0.5, x + TNO_radius + 0.5], [y - TNO_radius, y + TNO_radius])
+    tno_radius_lower_tick.set_data([x + TNO_radius + 0.75, x + TNO_radius + 0.25], [y - TNO_radius, y - TNO_radius])
+    tno_radius_upper_tick.set_data([x + TNO_radius + 0.75, x + TNO_radius + 0.25], [y + TNO_radius, y + TNO_radius])
+    tno_radius_label.set_position((x + TNO_radius + 1, y))
+
+    if background is None or not fig.canvas.supports_blit:
+        fig.canvas.draw_idle()
+        return
+    fig.canvas.restore_region(background)
+    draw_animated()
+    fig.canvas.blit(fig.bbox)
 
 x_slider.on_changed(update)
 y_slider.on_changed(update)